@@ -1,15 +1,25 @@
 """FastAPI backend server for minifig-builder."""
 
+import csv
+import functools
+import hashlib
 import os
 import sys
+import time
+from operator import itemgetter
 from pathlib import Path
+from types import MappingProxyType
 from typing import Optional
 from tempfile import TemporaryDirectory
 import shutil
-import xml.etree.ElementTree as ET
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks
+from lxml import etree as LET
+
+import orjson
+from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks, Depends, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
@@ -30,7 +40,8 @@ load_dotenv()
 app = FastAPI(
     title="Minifig Builder API",
     description="API for finding buildable LEGO minifigures from inventory",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -45,7 +56,40 @@ app.add_middleware(
 # Global state (in production, use a proper session/state management)
 latest_results = None
 cache_status = {}
-category_map_cache = None
+
+# Bumped whenever underlying caches change so TTL-cached endpoints recompute
+_cache_generation = 0
+
+
+def _bump_cache_generation():
+    """Invalidate all TTL-cached endpoint responses."""
+    global _cache_generation
+    _cache_generation += 1
+
+
+def _ttl_cache(ttl: float):
+    """Cache an endpoint's response for ttl seconds.
+
+    Read-only endpoints are polled by the frontend; this makes repeated
+    polls return the prebuilt payload instead of recomputing per request.
+    """
+    def decorator(func):
+        state = {'expiry': 0.0, 'generation': -1, 'value': None}
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            now = time.monotonic()
+            if (state['value'] is not None
+                    and now < state['expiry']
+                    and state['generation'] == _cache_generation):
+                return state['value']
+            value = await func(*args, **kwargs)
+            state['value'] = value
+            state['expiry'] = now + ttl
+            state['generation'] = _cache_generation
+            return value
+        return wrapper
+    return decorator
 
 
 class AnalysisResult(BaseModel):
@@ -63,65 +107,193 @@ class ThemeResponse(BaseModel):
 
 
 # Helper functions
-def load_csv_themes() -> dict:
-    """Load themes from M.csv."""
+_THEMES_CSV = Path(__file__).resolve().parents[1] / 'brickstore-data' / 'M.csv'
+_DIGITS = str.maketrans('', '', '0123456789')
+
+
+@functools.lru_cache(maxsize=4)
+def _themes_cached(path_str: str, mtime_ns: int) -> dict:
+    """Parse themes from M.csv, memoized on (path, mtime)."""
     themes = {}
-    root_dir = Path(__file__).resolve().parents[1]
-    csv_path = root_dir / 'brickstore-data' / 'M.csv'
-    
-    if not csv_path.exists():
-        return themes
-    
     try:
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                parts = line.strip().split('\t')
+        with open(path_str, 'r', encoding='utf-8', newline='') as f:
+            for parts in csv.reader(f, delimiter='\t'):
                 if len(parts) >= 4:
                     minifig_id = parts[2]
                     theme = parts[3]
                     if minifig_id and theme:
-                        # Extract theme prefix from minifig_id
-                        prefix = ''.join([c for c in minifig_id if not c.isdigit()])
+                        # Strip digits at C level to get the theme prefix
+                        prefix = minifig_id.translate(_DIGITS)
                         if prefix not in themes:
                             themes[prefix] = {'theme': theme, 'count': 0}
                         themes[prefix]['count'] += 1
     except Exception as e:
         print(f"Error loading themes: {e}")
-    
+
     return themes
 
 
-def load_category_map() -> dict:
-    """Load BrickLink category ID -> name mapping from categories.xml."""
-    global category_map_cache
-    if category_map_cache is not None:
-        return category_map_cache
+def load_csv_themes() -> dict:
+    """Load themes from M.csv, reparsing only when the file changes."""
+    if not _THEMES_CSV.exists():
+        return {}
+    return _themes_cached(str(_THEMES_CSV), _THEMES_CSV.stat().st_mtime_ns)
+
 
+@functools.lru_cache(maxsize=4)
+def _theme_list_cached(path_str: str, mtime_ns: int) -> list:
+    """Build the sorted theme list for /api/themes, memoized on (path, mtime)."""
+    themes = _themes_cached(path_str, mtime_ns)
+    return [
+        {
+            "theme": info["theme"],
+            "prefix": prefix,
+            "count": info["count"]
+        }
+        for prefix, info in sorted(themes.items())
+    ]
+
+
+def match_to_dict(m: MinifigMatch, cat_arr: list, max_cat_id: int) -> dict:
+    """Convert MinifigMatch to a response dictionary."""
+    price_summary = None
+    if m.price_data:
+        price_info = m.price_data.get('data', {})
+        if price_info:
+            ordered_new = price_info.get('ordered_new', {})
+            ordered_used = price_info.get('ordered_used', {})
+            avg_new = ordered_new.get('avg_price')
+            avg_used = ordered_used.get('avg_price')
+
+            if avg_new is not None or avg_used is not None:
+                price_summary = {}
+                if avg_new is not None:
+                    price_summary['new_condition'] = avg_new
+                if avg_used is not None:
+                    price_summary['used_condition'] = avg_used
+
+    # Get proper category name; the finder already surfaced
+    # category_id/thumbnail_url from the cached item data
+    category_name = m.category_name
+    if m.category_id is not None:
+        try:
+            cid = int(m.category_id)
+        except (TypeError, ValueError):
+            cid = -1
+        if 0 <= cid <= max_cat_id and cat_arr[cid] is not None:
+            category_name = cat_arr[cid]
+        else:
+            category_name = f"Category {m.category_id}"
+
+    return {
+        'minifig_id': m.minifig_id,
+        'minifig_name': m.minifig_name,
+        'year_released': m.year_released,
+        'category_name': category_name,
+        'thumbnail_url': m.thumbnail_url,
+        'total_parts': m.total_parts,
+        'buildable_count': m.buildable_count,
+        'matched_parts': m.matched_parts,
+        'missing_parts': m.missing_parts,
+        'match_percentage': m.match_percentage,
+        'can_build': m.can_build,
+        'prices_6month_average': price_summary,
+        'all_parts': m.matched_details if m.matched_details else [],
+        'missing_details': m.missing_details
+    }
+
+
+def _parse_categories_xml() -> dict:
+    """Parse BrickLink category ID -> name mapping from categories.xml."""
     root_dir = Path(__file__).resolve().parents[1]
     categories_path = root_dir / 'brickstore-data' / 'categories.xml'
 
     if not categories_path.exists():
-        category_map_cache = {}
-        return category_map_cache
+        return {}
 
     category_map = {}
     try:
-        tree = ET.parse(categories_path)
-        catalog = tree.getroot()
-        for item in catalog.findall('ITEM'):
+        # Stream ITEM elements instead of building the full DOM; clearing each
+        # element keeps memory constant regardless of catalog size.
+        for _, item in LET.iterparse(str(categories_path), events=('end',), tag='ITEM'):
             category_id = item.findtext('CATEGORY')
             category_name = item.findtext('CATEGORYNAME')
             if category_id and category_name:
                 try:
                     category_map[int(category_id)] = category_name
                 except ValueError:
-                    continue
+                    pass
+            item.clear()
+            while item.getprevious() is not None:
+                del item.getparent()[0]
     except Exception as e:
         print(f"Error loading categories: {e}")
         category_map = {}
 
-    category_map_cache = category_map
-    return category_map_cache
+    return category_map
+
+
+def _build_search_index(api: CachedBrickLinkAPI) -> list:
+    """Build a prebuilt lowercase search index over the minifig cache.
+
+    Each row carries the already-lowercased fields so /api/search never
+    lowercases or walks nested cache dicts per request.
+    """
+    index = []
+    for minifig_id, data in api.minifig_cache.items():
+        item_data = data.get('item_data', {})
+        name = item_data.get('name', '')
+        index.append((
+            minifig_id,
+            minifig_id.lower(),
+            name,
+            name.lower(),
+            item_data.get('category_name', '').lower(),
+            item_data.get('year_released'),
+            len(data.get('parts', [])),
+        ))
+    return index
+
+
+@app.on_event("startup")
+async def load_static_data():
+    """Parse static lookup data once and freeze it on app state."""
+    category_map = _parse_categories_xml()
+    app.state.category_map = MappingProxyType(category_map)
+    # Category ids are dense small ints; a list indexed by id avoids dict
+    # hashing on the per-minifig lookups below
+    if category_map:
+        max_cat_id = max(category_map)
+        cat_arr = [None] * (max_cat_id + 1)
+        for cid, cname in category_map.items():
+            cat_arr[cid] = cname
+    else:
+        max_cat_id = -1
+        cat_arr = []
+    app.state.cat_arr = cat_arr
+    app.state.max_cat_id = max_cat_id
+    app.state.latest_results_bytes = None
+    app.state.latest_results_etag = None
+    # Warm the theme cache; /api/themes re-checks the mtime so a fresh
+    # M.csv download is picked up without a restart.
+    load_csv_themes()
+    # Create the API client once; constructing it per request re-reads env
+    # vars, re-opens cache files and rebuilds the OAuth session.
+    try:
+        app.state.api = CachedBrickLinkAPI()
+        app.state.search_index = _build_search_index(app.state.api)
+    except ValueError as e:
+        print(f"⚠️  BrickLink API not configured: {e}")
+        app.state.api = None
+        app.state.search_index = []
+
+
+def get_api() -> CachedBrickLinkAPI:
+    """Dependency returning the shared BrickLink API client."""
+    api = app.state.api
+    if api is None:
+        raise HTTPException(status_code=400, detail="API not configured")
+    return api
 
 
 # API Endpoints
@@ -133,7 +305,7 @@ async def health_check():
 
 
 @app.post("/api/analyze")
-async def analyze_inventory(file: UploadFile = File(...)):
+async def analyze_inventory(file: UploadFile = File(...), api: CachedBrickLinkAPI = Depends(get_api)):
     """Upload inventory file and perform analysis."""
     global latest_results
     
@@ -145,19 +317,13 @@ async def analyze_inventory(file: UploadFile = File(...)):
         with TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir) / file.filename
             
-            # Save uploaded file
-            contents = await file.read()
-            with open(temp_path, 'wb') as f:
-                f.write(contents)
-            
-            # Initialize API and inventory
-            try:
-                api = CachedBrickLinkAPI()
-            except ValueError as e:
-                raise HTTPException(status_code=400, detail=f"API not configured: {str(e)}")
+            # Stream upload to disk in chunks; avoids buffering the whole
+            # file in memory for large BrickStore exports
+            with open(temp_path, 'wb') as out:
+                shutil.copyfileobj(file.file, out, length=65536)
             
             inventory = InventoryParser(temp_path)
-            if not inventory.load():
+            if not await run_in_threadpool(inventory.load):
                 raise HTTPException(status_code=400, detail="Failed to parse inventory file")
             
             # Get cached minifigs
@@ -168,77 +334,40 @@ async def analyze_inventory(file: UploadFile = File(...)):
                     detail="No minifigures in cache. Run cache_valuable_minifigs.py first."
                 )
             
-            # Find matches
+            # Find matches off the event loop; the search is CPU/cache-I/O
+            # bound and would otherwise stall every other request
             finder = MinifigureFinder(inventory, api)
-            matches = finder.search_minifigs(minifig_ids, use_cache_only=True)
-            
-            # Load category map for proper names
-            category_map = load_category_map()
-            
-            # Build response
-            complete = [m for m in matches if m.can_build]
-            incomplete = [m for m in matches if not m.can_build]
-            
-            def match_to_dict(m: MinifigMatch):
-                """Convert MinifigMatch to dictionary."""
-                price_summary = None
-                if m.price_data:
-                    price_info = m.price_data.get('data', {})
-                    if price_info:
-                        ordered_new = price_info.get('ordered_new', {})
-                        ordered_used = price_info.get('ordered_used', {})
-                        avg_new = ordered_new.get('avg_price')
-                        avg_used = ordered_used.get('avg_price')
-                        
-                        if avg_new is not None or avg_used is not None:
-                            price_summary = {}
-                            if avg_new is not None:
-                                price_summary['new_condition'] = avg_new
-                            if avg_used is not None:
-                                price_summary['used_condition'] = avg_used
-                
-                # Get proper category name from cache
-                category_name = m.category_name
-                thumbnail_url = None
-                cached_data = api.get_minifig_with_cache(m.minifig_id, use_cache_only=True)
-                if cached_data:
-                    item_data = cached_data.get('item_data', {})
-                    category_id = item_data.get('category_id')
-                    thumbnail_url = item_data.get('thumbnail_url')
-                    if category_id is not None:
-                        try:
-                            category_name = category_map.get(int(category_id), f"Category {category_id}")
-                        except (TypeError, ValueError):
-                            category_name = f"Category {category_id}"
-                
-                return {
-                    'minifig_id': m.minifig_id,
-                    'minifig_name': m.minifig_name,
-                    'year_released': m.year_released,
-                    'category_name': category_name,
-                    'thumbnail_url': thumbnail_url,
-                    'total_parts': m.total_parts,
-                    'buildable_count': m.buildable_count,
-                    'matched_parts': m.matched_parts,
-                    'missing_parts': m.missing_parts,
-                    'match_percentage': m.match_percentage,
-                    'can_build': m.can_build,
-                    'prices_6month_average': price_summary,
-                    'all_parts': m.matched_details if m.matched_details else [],
-                    'missing_details': m.missing_details
-                }
+            matches = await run_in_threadpool(finder.search_minifigs, minifig_ids, True)
             
+            # Category lookup table was built once at startup
+            cat_arr = app.state.cat_arr
+            max_cat_id = app.state.max_cat_id
+
+            # Build response in a single pass over matches
+            complete = []
+            incomplete = []
+            for m in matches:
+                d = match_to_dict(m, cat_arr, max_cat_id)
+                (complete if m.can_build else incomplete).append(d)
+
             latest_results = {
                 'summary': {
                     'total_checked': len(matches),
                     'complete_matches': len(complete),
                     'incomplete_matches': len(incomplete)
                 },
-                'complete': [match_to_dict(m) for m in complete],
-                'incomplete': [match_to_dict(m) for m in incomplete]
+                'complete': complete,
+                'incomplete': incomplete
             }
-            
-            return latest_results
+            # Encode once; /api/results then serves the prebuilt bytes
+            app.state.latest_results_bytes = orjson.dumps(latest_results)
+            app.state.latest_results_etag = hashlib.blake2b(
+                app.state.latest_results_bytes, digest_size=8
+            ).hexdigest()
+            _bump_cache_generation()
+
+            return Response(content=app.state.latest_results_bytes,
+                            media_type='application/json')
             
     except HTTPException:
         raise
@@ -247,21 +376,27 @@ async def analyze_inventory(file: UploadFile = File(...)):
 
 
 @app.get("/api/results")
-async def get_results():
+async def get_results(request: Request):
     """Get latest analysis results."""
-    global latest_results
-    
-    if latest_results is None:
+    results_bytes = app.state.latest_results_bytes
+
+    if results_bytes is None:
         raise HTTPException(status_code=404, detail="No analysis results available")
-    
-    return latest_results
+
+    # Polling clients re-sending the ETag get a zero-byte 304
+    etag = app.state.latest_results_etag
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304)
+
+    return Response(content=results_bytes, media_type='application/json',
+                    headers={'ETag': etag})
 
 
 @app.get("/api/cache/status")
-async def cache_status():
+@_ttl_cache(30)
+async def cache_status(api: CachedBrickLinkAPI = Depends(get_api)):
     """Get cache status information."""
     try:
-        api = CachedBrickLinkAPI()
         status = api.get_cache_status()
         return {
             "minifig_count": status['minifig_count'],
@@ -269,138 +404,133 @@ async def cache_status():
             "minifig_cache_file": status['minifig_cache_file'],
             "price_cache_file": status['price_cache_file'],
         }
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"API not configured: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting cache status: {str(e)}")
 
 
 @app.post("/api/cache/update-prices")
-async def update_cache_prices(background_tasks: BackgroundTasks):
+async def update_cache_prices(background_tasks: BackgroundTasks, api: CachedBrickLinkAPI = Depends(get_api)):
     """Trigger price cache update."""
     try:
-        api = CachedBrickLinkAPI()
         minifig_ids = api.get_cached_minifig_ids()
         
         if not minifig_ids:
             raise HTTPException(status_code=400, detail="No minifigures in cache")
         
-        # Add background task to update prices
+        # Add background task to update prices concurrently
         def update_prices():
-            for minifig_id in minifig_ids:
-                api.get_price_with_cache(minifig_id, use_cache_only=False)
+            api.update_prices_bulk(minifig_ids)
+            _bump_cache_generation()
         
         background_tasks.add_task(update_prices)
-        
+
         return {"message": f"Price update started for {len(minifig_ids)} minifigures"}
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"API not configured: {str(e)}")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating prices: {str(e)}")
 
 
 @app.get("/api/cache/minifigs")
-async def get_cached_minifigs():
+@_ttl_cache(30)
+async def get_cached_minifigs(api: CachedBrickLinkAPI = Depends(get_api)):
     """Get cached minifigures grouped by category."""
     try:
-        api = CachedBrickLinkAPI()
-        category_map = load_category_map()
+        cat_arr = app.state.cat_arr
+        max_cat_id = app.state.max_cat_id
         minifig_ids = api.get_cached_minifig_ids()
 
         if not minifig_ids:
             return {"categories": []}
 
         categories = {}
-        for minifig_id in minifig_ids:
-            data = api.get_minifig_with_cache(minifig_id, use_cache_only=True)
-            if not data:
-                continue
+        _setdefault = categories.setdefault
+        rows = api.get_minifigs_bulk(minifig_ids)
+        for minifig_id, data in rows.items():
             item_data = data.get('item_data', {})
             name = item_data.get('name', '')
             category_id = item_data.get('category_id')
-            if category_id is None:
-                category = 'Uncategorized'
+            # Fast path: cached category_ids are plain ints
+            if type(category_id) is int:
+                cid = category_id
+            elif category_id is None:
+                cid = None
             else:
                 try:
-                    category = category_map.get(int(category_id), f"Category {category_id}")
+                    cid = int(category_id)
                 except (TypeError, ValueError):
-                    category = f"Category {category_id}"
-            categories.setdefault(category, []).append({
+                    cid = -1
+            if cid is None:
+                category = 'Uncategorized'
+            elif 0 <= cid <= max_cat_id and cat_arr[cid] is not None:
+                category = cat_arr[cid]
+            else:
+                category = f"Category {category_id}"
+            _setdefault(category, []).append({
                 "id": minifig_id,
                 "name": name,
             })
 
-        grouped = []
-        for category_name in sorted(categories.keys()):
-            items = sorted(categories[category_name], key=lambda item: item["id"])
-            grouped.append({
+        # itemgetter keeps the per-item sort comparisons at C level
+        grouped = [
+            {
                 "category": category_name,
-                "items": items,
-            })
+                "items": sorted(categories[category_name], key=itemgetter("id")),
+            }
+            for category_name in sorted(categories)
+        ]
 
         return {"categories": grouped}
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"API not configured: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting cached minifigures: {str(e)}")
 
 
 @app.get("/api/search")
-async def search_minifigs(q: str = "", theme: str = ""):
+async def search_minifigs(q: str = "", theme: str = "", api: CachedBrickLinkAPI = Depends(get_api)):
     """Search cached minifigures by name or theme."""
     global latest_results
-    
+
     try:
-        api = CachedBrickLinkAPI()
-        minifig_ids = api.get_cached_minifig_ids()
-        
+        q_lower = q.lower()
+        theme_lower = theme.lower()
+
         results = []
-        for minifig_id in minifig_ids:
-            data = api.get_minifig_with_cache(minifig_id, use_cache_only=True)
-            if data:
-                name = data['item_data'].get('name', '').lower()
-                category = data['item_data'].get('category_name', '').lower()
-                
-                # Filter by search query and theme
-                if (q.lower() in name or q.lower() in minifig_id.lower()):
-                    if not theme or theme.lower() in category:
-                        results.append({
-                            'minifig_id': minifig_id,
-                            'name': data['item_data'].get('name', ''),
-                            'category': category,
-                            'year': data['item_data'].get('year_released'),
-                            'parts_count': len(data['parts'])
-                        })
-        
-        return {"results": results[:50]}  # Limit to 50 results
+        for minifig_id, id_lower, name, name_lower, cat_lower, year, parts_count in app.state.search_index:
+            # Filter by search query and theme
+            if (q_lower in name_lower or q_lower in id_lower):
+                if not theme_lower or theme_lower in cat_lower:
+                    results.append({
+                        'minifig_id': minifig_id,
+                        'name': name,
+                        'category': cat_lower,
+                        'year': year,
+                        'parts_count': parts_count
+                    })
+                    if len(results) >= 50:  # Limit to 50 results
+                        break
+
+        return {"results": results}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 
 @app.get("/api/themes")
+@_ttl_cache(30)
 async def get_themes():
     """Get list of available themes."""
-    themes = load_csv_themes()
-    
-    theme_list = [
-        {
-            "theme": info["theme"],
-            "prefix": prefix,
-            "count": info["count"]
-        }
-        for prefix, info in sorted(themes.items())
-    ]
-    
-    return {"themes": theme_list}
+    if not _THEMES_CSV.exists():
+        return {"themes": []}
+
+    return {"themes": _theme_list_cached(str(_THEMES_CSV), _THEMES_CSV.stat().st_mtime_ns)}
 
 
 @app.get("/api/stats")
-async def get_stats():
+@_ttl_cache(30)
+async def get_stats(api: CachedBrickLinkAPI = Depends(get_api)):
     """Get overall statistics."""
     global latest_results
-    
+
     try:
-        api = CachedBrickLinkAPI()
         status = api.get_cache_status()
         
         stats = {
@@ -1,16 +1,64 @@
 """Cache management for BrickLink API data."""
 
+import atexit
 import json
 import datetime
+import mmap
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Optional, List
 from dataclasses import asdict
 import sys
 import os
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import from root src package
 sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'src'))
-from fetch_bricklink_minifig import BrickLinkAPI
+from fetch_bricklink_minifig import BrickLinkAPI, MinifigPart
+
+
+def _loads(data):
+    """Parse JSON bytes/str, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(obj) -> bytes:
+    """Serialize to JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+def _load_json_file(path: Path):
+    """Parse a JSON file from an mmap'd buffer, avoiding a read+copy."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return {}
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if orjson is not None:
+                return orjson.loads(memoryview(mm))
+            return json.loads(mm[:])
+
+
+def _dump_file(obj, path: Path):
+    """Write obj to path as indented JSON, using orjson when available."""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2)
 
 
 class CachedBrickLinkAPI(BrickLinkAPI):
@@ -19,45 +67,140 @@ class CachedBrickLinkAPI(BrickLinkAPI):
     def __init__(self, cache_dir: Path = None):
         """Initialize cached API."""
         super().__init__()
+        # Reuse pooled connections across the many BrickLink calls an
+        # analyze/update run makes, instead of a TLS handshake per request
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.5)
+        ))
         if cache_dir is None:
             # Use workspace root (minifig-builder) for cache
             cache_dir = Path(__file__).resolve().parents[3] / '.api_cache'
         self.cache_dir = cache_dir
         self.cache_dir.mkdir(exist_ok=True)
         self.minifig_cache_file = self.cache_dir / 'minifigures.json'
+        self.minifig_sidecar_file = self.cache_dir / 'minifigures.jsonl'
         self.price_cache_file = self.cache_dir / 'minifig_prices.json'
         self.minifig_cache = self._load_minifig_cache()
         self.price_cache = self._load_price_cache()
-    
+        # Entries are immutable once fetched, so their serialized bytes
+        # are kept alongside and full saves just concatenate them instead
+        # of re-encoding the whole cache
+        self._encoded: Dict[str, bytes] = {}
+        # New minifig entries are appended to the JSONL sidecar so each
+        # write costs O(entry) instead of rewriting the whole base file;
+        # the sidecar is compacted into minifigures.json at exit.
+        self._minifig_sidecar = open(self.minifig_sidecar_file, 'ab', buffering=1 << 16)
+        atexit.register(self.compact)
+        # Parsed MinifigPart lists, built lazily once per minifig so
+        # repeated searches skip dataclass reconstruction; bounded LRU
+        # (dict insertion order, re-inserted on hit) and invalidated when
+        # an entry is re-fetched from the network. The bound must exceed
+        # the cached minifig count (~13k shipped): searches scan ids in a
+        # fixed order, so a smaller memo floods sequentially and every
+        # lookup evicts before it can be reused. The lock keeps pool
+        # threads from racing on the hit-refresh and eviction.
+        self._parsed_parts: Dict[str, List[MinifigPart]] = {}
+        self._parsed_parts_max = 32768
+        self._parsed_parts_lock = threading.Lock()
+        # Writes are debounced: fetches mark the caches dirty and flushes
+        # happen at most every few seconds (plus a forced flush at exit),
+        # so a cold-cache run doesn't rewrite the whole file per entry.
+        self._minifig_dirty = False
+        self._price_dirty = False
+        self._last_flush = time.monotonic()
+        # Fetches run on pool threads, so cache mutation, sidecar appends
+        # and flushes are serialized by one lock (reentrant: an oversized
+        # sidecar append compacts, which flushes)
+        self._cache_lock = threading.RLock()
+        atexit.register(self._maybe_flush, True)
+
+    def _maybe_flush(self, force: bool = False):
+        """Write dirty caches to disk, at most once per flush interval."""
+        if not force and time.monotonic() - self._last_flush < 5.0:
+            return
+        with self._cache_lock:
+            if not force and time.monotonic() - self._last_flush < 5.0:
+                return  # Another thread flushed while we waited
+            if self._minifig_dirty:
+                self._save_minifig_cache()
+                self._minifig_dirty = False
+            if self._price_dirty:
+                self._save_price_cache()
+                self._price_dirty = False
+            self._last_flush = time.monotonic()
+
     def _load_minifig_cache(self) -> Dict:
-        """Load cached minifigure data from disk."""
+        """Load cached minifigure data from disk, merging sidecar entries."""
+        cache = {}
         if self.minifig_cache_file.exists():
             try:
-                with open(self.minifig_cache_file, 'r') as f:
-                    return json.load(f)
+                cache = _load_json_file(self.minifig_cache_file)
             except Exception:
-                return {}
-        return {}
+                cache = {}
+        if self.minifig_sidecar_file.exists():
+            try:
+                with open(self.minifig_sidecar_file, 'rb') as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            cache.update(_loads(line))
+                        except Exception:
+                            continue
+            except Exception:
+                pass
+        return cache
+
+    def _encoded_entry(self, minifig_id: str) -> bytes:
+        """Serialized bytes for one cache entry, encoded at most once."""
+        enc = self._encoded.get(minifig_id)
+        if enc is None:
+            enc = self._encoded[minifig_id] = _dumps(self.minifig_cache[minifig_id])
+        return enc
+
+    def _append_minifig(self, minifig_id: str, entry: Dict):
+        """Append one new cache entry to the JSONL sidecar."""
+        self._encoded[minifig_id] = enc = _dumps(entry)
+        self._minifig_sidecar.write(
+            b'{' + _dumps(minifig_id) + b':' + enc + b'}\n')
+        # Keep the sidecar bounded; compaction folds it into the base file
+        if self._minifig_sidecar.tell() > 4 * 1024 * 1024:
+            self.compact()
+
+    def compact(self):
+        """Fold sidecar entries into the base cache file and truncate it."""
+        with self._cache_lock:
+            self._maybe_flush(force=True)
+            try:
+                self._minifig_sidecar.flush()
+            except ValueError:
+                return  # Sidecar already closed
+            if self.minifig_sidecar_file.exists() and self.minifig_sidecar_file.stat().st_size:
+                self._save_minifig_cache()
+                self._minifig_sidecar.truncate(0)
     
     def _load_price_cache(self) -> Dict:
         """Load cached price data from disk."""
         if self.price_cache_file.exists():
             try:
-                with open(self.price_cache_file, 'r') as f:
-                    return json.load(f)
+                return _load_json_file(self.price_cache_file)
             except Exception:
                 return {}
         return {}
-    
+
     def _save_minifig_cache(self):
-        """Save minifigure cache to disk."""
-        with open(self.minifig_cache_file, 'w') as f:
-            json.dump(self.minifig_cache, f, indent=2)
-    
+        """Save minifigure cache to disk by concatenating encoded entries."""
+        with open(self.minifig_cache_file, 'wb') as f:
+            f.write(b'{' + b','.join(
+                _dumps(mid) + b':' + self._encoded_entry(mid)
+                for mid in self.minifig_cache) + b'}')
+
     def _save_price_cache(self):
         """Save price cache to disk."""
-        with open(self.price_cache_file, 'w') as f:
-            json.dump(self.price_cache, f, indent=2)
+        _dump_file(self.price_cache, self.price_cache_file)
     
     def get_minifig_with_cache(self, minifig_id: str, use_cache_only: bool = False) -> Optional[Dict]:
         """Get minifigure data with caching."""
@@ -74,13 +217,16 @@ class CachedBrickLinkAPI(BrickLinkAPI):
             parts = self.get_minifigure_inventory(minifig_id)
             
             # Cache the result
-            self.minifig_cache[minifig_id] = {
+            entry = {
                 'item_data': item_data,
                 'parts': [asdict(p) for p in parts]
             }
-            self._save_minifig_cache()
-            
-            return self.minifig_cache[minifig_id]
+            with self._cache_lock:
+                self.minifig_cache[minifig_id] = entry
+                self._parsed_parts.pop(minifig_id, None)
+                self._append_minifig(minifig_id, entry)
+
+            return entry
         except Exception as e:
             print(f"⚠️  Failed to fetch {minifig_id}: {e}")
             return None
@@ -99,26 +245,89 @@ class CachedBrickLinkAPI(BrickLinkAPI):
             price_data = self.get_price_guide('MINIFIG', minifig_id)
             
             # Cache the result (store timestamp for reference)
-            self.price_cache[minifig_id] = {
+            entry = {
                 'data': price_data,
                 'updated': datetime.datetime.now().isoformat()
             }
-            self._save_price_cache()
-            
-            return self.price_cache[minifig_id]
+            with self._cache_lock:
+                self.price_cache[minifig_id] = entry
+                self._price_dirty = True
+            self._maybe_flush()
+
+            return entry
         except Exception as e:
             return None
     
-    def get_cached_minifig_ids(self) -> List[str]:
-        """Load minifigure IDs from cache file."""
-        if self.minifig_cache_file.exists():
+    def get_regular_parts(self, minifig_id: str, use_cache_only: bool = False) -> Optional[List[MinifigPart]]:
+        """Get the parsed regular (non-alternate/counterpart) parts list.
+
+        The dataclass construction from cached dicts happens once per
+        process; repeated searches reuse the parsed list.
+        """
+        with self._parsed_parts_lock:
+            parts = self._parsed_parts.pop(minifig_id, None)
+            if parts is not None:
+                self._parsed_parts[minifig_id] = parts  # Refresh LRU position
+                return parts
+
+        data = self.get_minifig_with_cache(minifig_id, use_cache_only)
+        if not data:
+            return None
+
+        parts = [
+            p for p in (MinifigPart(**raw) for raw in data['parts'])
+            if not p.is_alternate and not p.is_counterpart
+        ]
+        # Intern the strings repeated across minifigs (ids, color names)
+        # so thousands of parsed parts share one object per distinct value
+        for p in parts:
+            p.part_id = sys.intern(p.part_id)
+            p.color_name = sys.intern(p.color_name)
+        with self._parsed_parts_lock:
+            if len(self._parsed_parts) >= self._parsed_parts_max:
+                self._parsed_parts.pop(next(iter(self._parsed_parts)), None)
+            self._parsed_parts[minifig_id] = parts
+        return parts
+
+    def get_minifigs_bulk(self, minifig_ids: List[str]) -> Dict[str, Dict]:
+        """Get cached data for many minifigures in a single cache pass."""
+        cache = self.minifig_cache
+        return {mid: cache[mid] for mid in minifig_ids if mid in cache}
+
+    def update_prices_bulk(self, minifig_ids: List[str], max_workers: int = 16):
+        """Refresh the price cache for many minifigures concurrently.
+
+        Fetches run on a bounded thread pool so wall-clock time is limited
+        by the concurrency cap rather than one HTTP round-trip per id; the
+        cache file is written once at the end instead of per fetch.
+        """
+        def fetch(minifig_id):
             try:
-                with open(self.minifig_cache_file, 'r') as f:
-                    cache = json.load(f)
-                    return sorted(list(cache.keys()))
+                return minifig_id, self.get_price_guide('MINIFIG', minifig_id)
             except Exception:
-                return []
-        return []
+                return minifig_id, None
+
+        fetched = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for minifig_id, price_data in pool.map(fetch, minifig_ids):
+                if price_data:
+                    fetched[minifig_id] = {
+                        'data': price_data,
+                        'updated': datetime.datetime.now().isoformat()
+                    }
+
+        # Merge and save under the cache lock — two concurrent bulk
+        # updates (or one racing the exit flush) must not write the
+        # price file with separate handles
+        if fetched:
+            with self._cache_lock:
+                self.price_cache.update(fetched)
+                self._save_price_cache()
+        return len(fetched)
+
+    def get_cached_minifig_ids(self) -> List[str]:
+        """Get the sorted minifigure IDs known to the in-memory cache."""
+        return sorted(self.minifig_cache.keys())
     
     def get_cache_status(self) -> Dict:
         """Get cache status information."""
@@ -1,12 +1,18 @@
 """Parser for BrickLink XML inventory files."""
 
+import sys
 import xml.etree.ElementTree as ET
 from pathlib import Path
 from typing import Dict, Tuple, Optional
 from dataclasses import dataclass
 
+try:
+    from lxml import etree as LET
+except ImportError:
+    LET = None
 
-@dataclass
+
+@dataclass(slots=True)
 class InventoryPart:
     """Part in user's inventory."""
     part_id: str
@@ -17,51 +23,106 @@ class InventoryPart:
     remarks: str = ''
 
 
+class _InventoryTarget:
+    """SAX-style parser target that emits ITEM rows without Element objects.
+
+    Works for both lxml and xml.etree XMLParser targets; __slots__ keeps
+    the per-callback attribute loads cheap.
+    """
+
+    __slots__ = ('_add_item', '_fields', '_text')
+
+    def __init__(self, add_item):
+        self._add_item = add_item
+        self._fields = None
+        self._text = []
+
+    def start(self, tag, attrib):
+        if tag == 'ITEM':
+            self._fields = {}
+        self._text = []
+
+    def data(self, data):
+        self._text.append(data)
+
+    def end(self, tag):
+        if self._fields is None:
+            return
+        if tag == 'ITEM':
+            self._add_item(self._fields)
+            self._fields = None
+        else:
+            self._fields[tag] = ''.join(self._text)
+
+    def close(self):
+        return None
+
+
 class InventoryParser:
     """Parser for BrickLink XML inventory."""
     
     def __init__(self, xml_path: Path):
         """Initialize inventory parser."""
         self.xml_path = xml_path
-        self.inventory: Dict[Tuple[str, int], InventoryPart] = {}
-    
+        # Structure-of-arrays layout: one index dict keyed by packed
+        # "part_id\x00color" strings plus fixed-width parallel columns.
+        # Rows go straight into the columns at parse time; no per-part
+        # objects are kept around.
+        self._idx: Dict[str, int] = {}
+        self._part_ids: list = []
+        self._colors: list = []
+        self._qtys: list = []
+        self._remarks: list = []
+        self._prices: list = []
+
+    def _add_item(self, fields: Dict[str, str]):
+        """Merge one parsed ITEM row (tag -> text) into the columns."""
+        if fields.get('ITEMTYPE') not in ('P', 'M'):
+            return
+        # Intern part ids: the same id string recurs across inventory rows
+        # and cached minifig parts, so all of them share one object and
+        # dict lookups can short-circuit on identity
+        item_id = sys.intern(fields['ITEMID'])
+        color = int(fields['COLOR'])
+        qty = int(fields['QTY'])
+        price = float(fields['PRICE']) if fields.get('PRICE') else 0.0
+        remarks = fields.get('REMARKS') or ''
+
+        i = self._idx.get(item_id + '\x00' + str(color))
+        if i is not None:
+            self._qtys[i] += qty
+            # Keep first remarks if multiple entries
+            if not self._remarks[i] and remarks:
+                self._remarks[i] = remarks
+        else:
+            self._idx[item_id + '\x00' + str(color)] = len(self._qtys)
+            self._part_ids.append(item_id)
+            self._colors.append(color)
+            self._qtys.append(qty)
+            self._remarks.append(remarks)
+            self._prices.append(price)
+
     def load(self) -> bool:
         """Load and parse XML inventory."""
         print(f"📂 Loading inventory: {self.xml_path.name}")
-        
+
         try:
-            tree = ET.parse(self.xml_path)
-            root = tree.getroot()
-            
-            for item in root.findall('ITEM'):
-                item_id = item.find('ITEMID').text
-                item_type = item.find('ITEMTYPE').text
-                color = int(item.find('COLOR').text)
-                qty = int(item.find('QTY').text)
-                price_elem = item.find('PRICE')
-                price = float(price_elem.text) if price_elem is not None and price_elem.text else 0.0
-                remarks_elem = item.find('REMARKS')
-                remarks = remarks_elem.text if remarks_elem is not None and remarks_elem.text else ''
-                
-                if item_type in ['P', 'M']:
-                    key = (item_id, color)
-                    if key in self.inventory:
-                        self.inventory[key].quantity += qty
-                        # Keep first remarks if multiple entries
-                        if not self.inventory[key].remarks and remarks:
-                            self.inventory[key].remarks = remarks
-                    else:
-                        self.inventory[key] = InventoryPart(
-                            part_id=item_id,
-                            color_id=color,
-                            quantity=qty,
-                            item_type=item_type,
-                            price=price,
-                            remarks=remarks
-                        )
-            
-            unique = len(self.inventory)
-            total = sum(p.quantity for p in self.inventory.values())
+            if LET is not None:
+                # lxml target parser: rows are built straight from SAX
+                # callbacks, no Element objects are allocated at all
+                parser = LET.XMLParser(target=_InventoryTarget(self._add_item))
+                LET.parse(str(self.xml_path), parser)
+            else:
+                # Same target on the stdlib expat parser, fed in 64KB
+                # blocks: no Element objects and constant peak memory
+                parser = ET.XMLParser(target=_InventoryTarget(self._add_item))
+                with open(self.xml_path, 'rb') as f:
+                    while chunk := f.read(1 << 16):
+                        parser.feed(chunk)
+                parser.close()
+
+            unique = len(self._idx)
+            total = sum(self._qtys)
             print(f"✅ Loaded: {unique:,} unique parts, {total:,} total pieces\n")
             return True
         except Exception as e:
@@ -74,15 +135,15 @@ class InventoryParser:
         Returns:
             (has_enough, available, remarks, price)
         """
-        key = (part_id, color_id)
-        if key in self.inventory:
-            inv_part = self.inventory[key]
-            return (inv_part.quantity >= quantity, inv_part.quantity, inv_part.remarks, inv_part.price)
-        return (False, 0, '', 0.0)
+        i = self._idx.get(part_id + '\x00' + str(color_id))
+        if i is None:
+            return (False, 0, '', 0.0)
+        available = self._qtys[i]
+        return (available >= quantity, available, self._remarks[i], self._prices[i])
     
     def get_stats(self) -> Dict:
         """Get inventory statistics."""
         return {
-            'unique_parts': len(self.inventory),
-            'total_pieces': sum(p.quantity for p in self.inventory.values()),
+            'unique_parts': len(self._idx),
+            'total_pieces': sum(self._qtys),
         }
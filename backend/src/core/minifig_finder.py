@@ -1,21 +1,26 @@
 """Minifigure finder logic."""
 
 import json
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, List, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from collections import defaultdict
 import sys
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add root src directory to path
 sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'src'))
-from fetch_bricklink_minifig import MinifigPart
+from fetch_bricklink_minifig import TokenBucket
 from .cache_manager import CachedBrickLinkAPI
 from .inventory_parser import InventoryParser
 
 
-@dataclass
+@dataclass(slots=True)
 class MinifigMatch:
     """Minifigure match result."""
     minifig_id: str
@@ -32,6 +37,8 @@ class MinifigMatch:
     matched_details: List[Dict] = None
     price_data: Optional[Dict] = None
     profit: float = 0.0
+    category_id: Optional[int] = None
+    thumbnail_url: Optional[str] = None
 
 
 class MinifigureFinder:
@@ -84,23 +91,21 @@ class MinifigureFinder:
         price_info = self.api.get_price_with_cache(minifig_id, use_cache_only)
         
         item_data = data['item_data']
-        parts_data = data['parts']
-        
-        # Convert to MinifigPart objects
-        parts = [MinifigPart(**p) for p in parts_data]
-        
-        # Filter to regular parts (not alternates/counterparts)
-        regular_parts = [p for p in parts if not p.is_alternate and not p.is_counterpart]
-        
+
+        # Regular (non-alternate/counterpart) parts, parsed once per
+        # process and memoized by the cache layer
+        regular_parts = self.api.get_regular_parts(minifig_id, use_cache_only)
+
         if not regular_parts:
             return None
         
-        # Check each part
+        # Check each part. The lists are tiny (~5 parts per minifig), so
+        # a plain lookup per part beats any per-minifig array setup
         matched = 0
         missing = []
         matched_parts = []
         build_limits = []
-        
+
         for part in regular_parts:
             has_enough, available, remarks, price = self.inventory.has_part(
                 part.part_id, part.color_id, part.quantity
@@ -150,7 +155,9 @@ class MinifigureFinder:
             buildable_count=buildable_count,
             missing_details=missing,
             matched_details=matched_parts,
-            price_data=price_info
+            price_data=price_info,
+            category_id=item_data.get('category_id'),
+            thumbnail_url=item_data.get('thumbnail_url')
         )
     
     def search_minifigs(self, minifig_ids: List[str], use_cache_only: bool = False) -> List[MinifigMatch]:
@@ -165,19 +172,34 @@ class MinifigureFinder:
             print("   (Using cached data only)")
 
         matches = []
-        
-        for i, minifig_id in enumerate(minifig_ids, 1):
-            if i % 10 == 0 or i == len(minifig_ids):
-                print(f"   Progress: {i}/{len(minifig_ids)}", end='\r')
-            
-            match = self.check_minifig(minifig_id, use_cache_only)
-            if match:
-                matches.append(match)
-            
-            # Rate limiting (only if not using cache)
-            if not use_cache_only:
-                time.sleep(0.15)
-        
+
+        if use_cache_only:
+            # Cache-only checks are pure dict work with no I/O — a thread
+            # pool only adds GIL contention here, so keep them serial
+            for minifig_id in minifig_ids:
+                match = self.check_minifig(minifig_id, True)
+                if match:
+                    matches.append(match)
+        else:
+            # Live fetches overlap on a small pool; the token bucket keeps
+            # the sustained request rate at the same ~6.6 req/s the old
+            # serial sleep(0.15) loop allowed, without serializing the
+            # network latency
+            limiter = TokenBucket(rate=6.6, capacity=6)
+
+            def fetch(minifig_id):
+                limiter.consume()
+                return self.check_minifig(minifig_id, use_cache_only)
+
+            with ThreadPoolExecutor(max_workers=6) as pool:
+                futures = [pool.submit(fetch, mid) for mid in minifig_ids]
+                for i, future in enumerate(as_completed(futures), 1):
+                    if i % 10 == 0 or i == len(minifig_ids):
+                        print(f"   Progress: {i}/{len(minifig_ids)}", end='\r')
+                    match = future.result()
+                    if match:
+                        matches.append(match)
+
         print()  # New line
 
         # Calculate metrics for all matches
@@ -287,7 +309,9 @@ class MinifigureFinder:
                 can_build=False,
                 missing_details=unavailable_parts + match.missing_details,
                 matched_details=available_parts,
-                price_data=match.price_data
+                price_data=match.price_data,
+                category_id=match.category_id,
+                thumbnail_url=match.thumbnail_url
             )
             final_results.append(partial_match)
 
@@ -299,14 +323,15 @@ def save_results_json(matches: List[MinifigMatch], output_file: Path):
     complete = [m for m in matches if m.can_build]
     incomplete = [m for m in matches if not m.can_build]
     
-    # Convert to dictionaries with only necessary data
+    # Convert to dictionaries with only necessary data. Attribute access
+    # instead of asdict(): asdict deep-copies every part detail dict just
+    # to throw most of the copy away, so the detail lists are referenced
+    # as-is.
     def match_to_dict(match: MinifigMatch) -> Dict:
-        d = asdict(match)
-        
         # Extract 6-month average prices
         price_summary = None
-        if d['price_data']:
-            price_info = d['price_data'].get('data', {})
+        if match.price_data:
+            price_info = match.price_data.get('data', {})
             if price_info:
                 ordered_new = price_info.get('ordered_new', {})
                 ordered_used = price_info.get('ordered_used', {})
@@ -321,32 +346,45 @@ def save_results_json(matches: List[MinifigMatch], output_file: Path):
                         price_summary['used_condition'] = avg_used
         
         return {
-            'minifig_id': d['minifig_id'],
-            'minifig_name': d['minifig_name'],
-            'year_released': d['year_released'],
-            'category_name': d['category_name'],
-            'total_parts': d['total_parts'],
-            'buildable_count': d.get('buildable_count', 0),
-            'matched_parts': d['matched_parts'],
-            'missing_parts': d['missing_parts'],
-            'match_percentage': d['match_percentage'],
-            'can_build': d['can_build'],
+            'minifig_id': match.minifig_id,
+            'minifig_name': match.minifig_name,
+            'year_released': match.year_released,
+            'category_name': match.category_name,
+            'total_parts': match.total_parts,
+            'buildable_count': match.buildable_count,
+            'matched_parts': match.matched_parts,
+            'missing_parts': match.missing_parts,
+            'match_percentage': match.match_percentage,
+            'can_build': match.can_build,
             'prices_6month_average': price_summary,
-            'all_parts': d['matched_details'] if d['matched_details'] else [],
-            'missing_details': d['missing_details']
+            'all_parts': match.matched_details if match.matched_details else [],
+            'missing_details': match.missing_details
         }
     
-    output_data = {
-        'summary': {
-            'total_checked': len(matches),
-            'complete_matches': len(complete),
-            'incomplete_matches': len(incomplete)
-        },
-        'complete': [match_to_dict(m) for m in complete],
-        'incomplete': [match_to_dict(m) for m in incomplete]
+    summary = {
+        'total_checked': len(matches),
+        'complete_matches': len(complete),
+        'incomplete_matches': len(incomplete)
     }
-    
-    with open(output_file, 'w') as f:
-        json.dump(output_data, f, indent=2)
-    
+
+    if orjson is not None:
+        def dump_item(obj):
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    else:
+        def dump_item(obj):
+            return json.dumps(obj, indent=2).encode('utf-8')
+
+    # Stream one match at a time around a hand-written JSON skeleton, so
+    # peak memory is one serialized match rather than the whole document
+    with open(output_file, 'wb') as f:
+        f.write(b'{\n"summary": ' + dump_item(summary))
+        for section, group in (('complete', complete), ('incomplete', incomplete)):
+            f.write(b',\n"' + section.encode('ascii') + b'": [')
+            for i, match in enumerate(group):
+                if i:
+                    f.write(b',\n')
+                f.write(dump_item(match_to_dict(match)))
+            f.write(b']')
+        f.write(b'}\n')
+
     print(f"\n💾 Results saved to: {output_file}")
@@ -1,11 +1,22 @@
 """Shared helpers for BrickLink price guide access."""
 
+import functools
 from typing import Dict
 
 
-def fetch_minifig_price(api, minifig_id: str) -> Dict:
-    """Fetch price guide data for a minifigure and return a safe result."""
+@functools.lru_cache(maxsize=None)
+def _cached_price(api, minifig_id: str) -> Dict:
+    """Fetch once per (client, id); BrickLinkAPI hashes by identity."""
     try:
         return api.get_price_guide('MINIFIG', minifig_id)
     except Exception:
         return {}
+
+
+def fetch_minifig_price(api, minifig_id: str) -> Dict:
+    """Fetch price guide data for a minifigure and return a safe result.
+
+    Memoized for the session, so an id appearing in several themes (or
+    repeated cache_theme calls) costs one HTTP request.
+    """
+    return _cached_price(api, minifig_id)
@@ -14,18 +14,38 @@ Usage:
 """
 
 import json
+import os
 import sys
-import time
 import argparse
-import csv
-import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, List, Tuple
 from datetime import datetime
-from dataclasses import asdict
-from fetch_bricklink_minifig import BrickLinkAPI
+from fetch_bricklink_minifig import BrickLinkAPI, _PART_FIELDS, _part_rows
 from bricklink_price import fetch_minifig_price
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _save_json_atomic(obj: Dict, path: Path):
+    """Serialize compactly (orjson when available) and replace atomically."""
+    data = orjson.dumps(obj) if orjson is not None else json.dumps(obj).encode('utf-8')
+    tmp = path.with_suffix('.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _alpha_prefix(s: str) -> str:
+    """Leading alphabetic prefix of s, without firing up the regex engine."""
+    i = 0
+    n = len(s)
+    while i < n and s[i].isalpha():
+        i += 1
+    return s[:i]
+
 
 class ValueableMinifigCache:
     """Cache minifigures based on price criteria."""
@@ -41,38 +61,39 @@ class ValueableMinifigCache:
             )
         
         themes = {}
-        prefix_pattern = re.compile(r'^[A-Za-z]+')
-        
+
         with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f, delimiter='\t')
-            next(reader)  # Skip header
-            next(reader)  # Skip empty line
-            
-            for row in reader:
+            next(f)  # Skip header
+            next(f)  # Skip empty line
+
+            # Only fields 1 and 2 are used, so split each line at most
+            # three times instead of materializing full csv.reader rows
+            for line in f:
+                row = line.rstrip('\n').split('\t', 3)
                 if len(row) < 3:
                     continue
-                
+
                 minifig_id = row[2].strip()
                 category_name = row[1].strip()
                 
-                # Extract theme prefix using regex
-                match = prefix_pattern.match(minifig_id)
-                if not match:
+                # Extract theme prefix
+                prefix = _alpha_prefix(minifig_id)
+                if not prefix:
                     continue
-                
-                prefix = match.group().lower()
-                
-                # Initialize theme if not seen before
-                if prefix not in themes:
-                    # Derive simple theme name from category
-                    theme_name = category_name.split(' / ')[0]
-                    themes[prefix] = {
+
+                prefix = prefix.lower()
+
+                # One hash probe per row: fetch the entry, creating it on
+                # first sight with the theme name derived from the category
+                entry = themes.get(prefix)
+                if entry is None:
+                    entry = themes[prefix] = {
                         'ids': [],
-                        'name': theme_name
+                        'name': category_name.split(' / ', 1)[0]
                     }
-                
+
                 # Add ID to theme (keep original case for BrickLink API)
-                themes[prefix]['ids'].append(minifig_id)
+                entry['ids'].append(minifig_id)
         
         return themes
     
@@ -95,6 +116,8 @@ class ValueableMinifigCache:
         self.minifig_cache = self._load_minifig_cache()
         self.price_cache = self._load_price_cache()
         
+        self._exists_cache: Dict[str, Tuple[bool, Dict]] = {}
+
         self.checked = 0
         self.valid = 0
         self.cached = 0
@@ -123,43 +146,57 @@ class ValueableMinifigCache:
     
     def _save_minifig_cache(self):
         """Save minifigure cache to disk."""
-        with open(self.minifig_cache_file, 'w') as f:
-            json.dump(self.minifig_cache, f, indent=2)
-    
+        _save_json_atomic(self.minifig_cache, self.minifig_cache_file)
+
     def _save_price_cache(self):
         """Save price cache to disk."""
-        with open(self.price_cache_file, 'w') as f:
-            json.dump(self.price_cache, f, indent=2)
+        _save_json_atomic(self.price_cache, self.price_cache_file)
     
     def minifig_exists(self, minifig_id: str) -> Tuple[bool, Dict]:
-        """Check if minifigure exists in BrickLink and return item data."""
+        """Check if minifigure exists in BrickLink and return item data.
+
+        Results are memoized — lru_cache on get_item does not remember
+        failed probes, so negative answers are cached here.
+        """
+        cached = self._exists_cache.get(minifig_id)
+        if cached is not None:
+            return cached
+
         try:
             item = self.api.get_item('MINIFIG', minifig_id)
-            return bool(item), item if item else {}
+            result = (bool(item), item if item else {})
         except:
-            return False, {}
+            result = (False, {})
+        self._exists_cache[minifig_id] = result
+        return result
     
     def get_price_data(self, minifig_id: str) -> Dict:
         """Get price guide data for a minifigure."""
+        # Share the API client's token bucket so scrapes count against
+        # the same rate budget as the item/color calls
+        self.api._bucket.consume()
         return fetch_minifig_price(self.api, minifig_id)
     
     def get_minifig_parts(self, minifig_id: str) -> List[Dict]:
         """Get parts list for a minifigure."""
         try:
             parts = self.api.get_minifigure_inventory(minifig_id)
-            return [asdict(p) for p in parts] if parts else []
+            # Direct field projection — asdict() walks the dataclass
+            # machinery and deep-copies every value
+            return [dict(zip(_PART_FIELDS, row)) for row in _part_rows(parts)] if parts else []
         except:
             return []
     
     def is_valuable(self, price_data: Dict, price_field: str = 'ordered_used') -> Tuple[bool, float]:
         """Check if minifigure meets price criteria."""
+        # One dict walk for both modes; avg_price may arrive as a string
+        # from the scraper, so coerce it once here
+        section = price_data.get(price_field)
+        avg_price = float(section.get('avg_price') or 0) if section else 0.0
         if self.cache_all:
-            avg_price = price_data.get(price_field, {}).get('avg_price', 0)
             return True, avg_price
-        if price_field not in price_data:
+        if section is None:
             return False, 0
-        
-        avg_price = price_data[price_field].get('avg_price', 0)
         return avg_price >= self.min_price, avg_price
     
     def cache_theme(self, theme: str) -> None:
@@ -182,73 +219,110 @@ class ValueableMinifigCache:
             print(f"   Filtering for avg_price > ${self.min_price}")
         print("-" * 70)
         
-        for minifig_id in minifig_ids:
-            self.checked += 1
-            
-            # Skip if already cached
-            if minifig_id in self.minifig_cache:
-                self.skipped += 1
-                continue
-            
-            # Show progress
-            if self.checked % 50 == 0:
-                print(f"   Checked: {self.checked} | Valid: {self.valid} | Cached: {self.cached} | Valuable: {self.valuable}")
-            
-            # Check if exists
+        def probe(minifig_id):
+            """Run the network side of one id: exists -> price -> parts."""
             exists, item_data = self.minifig_exists(minifig_id)
             if not exists:
-                continue
-            
-            self.valid += 1
-            
-            # Get price data
+                return minifig_id, None
+
             price_data = self.get_price_data(minifig_id)
-            
             if not price_data and not self.cache_all:
-                continue
-            
-            # Check if meets price criteria
-            is_valuable, avg_price = self.is_valuable(price_data or {})
-            
-            if is_valuable:
+                return minifig_id, {'item_data': item_data}
+
+            valuable, avg_price = self.is_valuable(price_data or {})
+            result = {
+                'item_data': item_data,
+                'price_data': price_data,
+                'valuable': valuable,
+                'avg_price': avg_price,
+            }
+            if valuable:
+                result['parts'] = self.get_minifig_parts(minifig_id)
+            return minifig_id, result
+
+        # Prefilter already-cached ids in one pass and account for them
+        # in aggregate, so only genuinely pending ids reach the pool
+        pending = [m for m in minifig_ids if m not in self.minifig_cache]
+        skipped = len(minifig_ids) - len(pending)
+        self.checked += skipped
+        self.skipped += skipped
+        if skipped:
+            print(f"   Skipping {skipped} already-cached minifigures")
+
+        # Probes run on a bounded pool (the shared token bucket caps the
+        # request rate); cache writes stay on this thread, so the dicts
+        # need no locking
+        # Valuable-hit lines are buffered and flushed together with the
+        # periodic saves, keeping stdout churn out of the result loop
+        hit_lines = []
+
+        # One timestamp per save batch; isoformat() per hit adds up over
+        # thousands of ids and batch granularity is plenty for 'updated'
+        batch_stamp = datetime.now().isoformat()
+
+        def flush_hits():
+            if hit_lines:
+                sys.stdout.write('\n'.join(hit_lines) + '\n')
+                hit_lines.clear()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(probe, mid) for mid in pending]
+            for future in as_completed(futures):
+                minifig_id, result = future.result()
+                self.checked += 1
+
+                # Show progress occasionally
+                if self.checked % 500 == 0:
+                    flush_hits()
+                    print(f"   Checked: {self.checked} | Valid: {self.valid} | Cached: {self.cached} | Valuable: {self.valuable}")
+
+                if result is None:
+                    continue
+
+                self.valid += 1
+
+                if not result.get('valuable'):
+                    continue
+
                 self.valuable += 1
-                
-                # Fetch minifigure parts
-                parts = self.get_minifig_parts(minifig_id)
-                
+                item_data = result['item_data']
+                price_data = result.get('price_data')
+                avg_price = result['avg_price']
+                parts = result.get('parts', [])
+
                 # Cache minifigure data (item_data + parts)
                 self.minifig_cache[minifig_id] = {
                     'item_data': item_data,
                     'parts': parts
                 }
-                
+
                 # Cache the price when available
                 if price_data:
                     self.price_cache[minifig_id] = {
                         'data': price_data,
-                        'updated': datetime.now().isoformat()
+                        'updated': batch_stamp
                     }
                 self.cached += 1
-                
+
                 # Get minifig name
                 minifig_name = item_data.get('name', 'Unknown')
                 parts_count = len(parts)
-                
+
                 if price_data:
                     condition = 'Used' if 'ordered_used' in price_data else 'New'
                     price_label = f"${avg_price:.2f} ({condition})"
                 else:
                     price_label = "No price data"
-                print(f"✅ {minifig_id} - {price_label} - {parts_count} parts - {minifig_name[:35]}")
-                
+                hit_lines.append(f"✅ {minifig_id} - {price_label} - {parts_count} parts - {minifig_name[:35]}")
+
                 # Save periodically
                 if self.cached % 10 == 0:
+                    flush_hits()
                     self._save_minifig_cache()
                     self._save_price_cache()
-            
-            # Rate limiting
-            time.sleep(0.15)
-        
+                    batch_stamp = datetime.now().isoformat()
+
+        flush_hits()
         print("-" * 70)
     
     def summarize(self) -> None:
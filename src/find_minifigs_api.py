@@ -19,18 +19,27 @@ Results are saved to: reports/buildable-minifigs.json (default)
 """
 
 import xml.etree.ElementTree as ET
+import atexit
 import json
+import os
 import sys
+import threading
 import time
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, List, Set, Tuple, Optional
 from dataclasses import dataclass, asdict
-from collections import defaultdict
+import numpy as np
 from fetch_bricklink_minifig import BrickLinkAPI, MinifigPart
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-@dataclass
+
+@dataclass(slots=True)
 class InventoryPart:
     """Part in user's inventory."""
     part_id: str
@@ -41,7 +50,40 @@ class InventoryPart:
     remarks: str = ''
 
 
-@dataclass
+@dataclass(slots=True)
+class MatchedPart:
+    """Matched inventory part for one minifigure.
+
+    Slotted, so the allocation loops read fields as fixed-offset
+    attribute loads rather than string-keyed dict probes. Serialized to
+    a dict only when results are written to JSON.
+    """
+    part_id: str
+    color_id: int
+    quantity: int
+    price: float
+    total_price: float
+    part_name: str
+    color_name: str
+    remarks: str
+    # Inventory availability, reused by the allocation pass; not part
+    # of the JSON output
+    available: int = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            'part_id': self.part_id,
+            'part_name': self.part_name,
+            'color_id': self.color_id,
+            'color_name': self.color_name,
+            'quantity': self.quantity,
+            'price': self.price,
+            'total_price': self.total_price,
+            'remarks': self.remarks
+        }
+
+
+@dataclass(slots=True)
 class MinifigMatch:
     """Minifigure match result."""
     minifig_id: str
@@ -55,9 +97,29 @@ class MinifigMatch:
     can_build: bool
     missing_details: List[Dict]
     buildable_count: int = 0
-    matched_details: List[Dict] = None
+    matched_details: List[MatchedPart] = None
     price_data: Optional[Dict] = None
     profit: float = 0.0
+    # Sort-only metrics, filled in by search_minifigs before the sorts
+    parts_cost: float = 0.0
+    sort_year: int = 0
+
+
+def _match_kernel(needed: np.ndarray, available: np.ndarray) -> Tuple[int, int, np.ndarray]:
+    """Per-part matching math over int32 arrays.
+
+    Returns (matched count, buildable copies, has-enough mask). Kept as
+    pure integer array ops so the Python side only handles the dict
+    bookkeeping around it.
+    """
+    has = available >= needed
+    matched = int(has.sum())
+    pos = needed > 0
+    if pos.any():
+        buildable = int((available[pos] // needed[pos]).min())
+    else:
+        buildable = 0
+    return matched, buildable, has
 
 
 class CachedBrickLinkAPI(BrickLinkAPI):
@@ -73,39 +135,113 @@ class CachedBrickLinkAPI(BrickLinkAPI):
         self.cache_dir.mkdir(exist_ok=True)
         self.minifig_cache_file = self.cache_dir / 'minifigures.json'
         self.price_cache_file = self.cache_dir / 'minifig_prices.json'
+        self.part_index_file = self.cache_dir / 'part_index.json'
         self.minifig_cache = self._load_minifig_cache()
         self.price_cache = self._load_price_cache()
-    
-    def _load_minifig_cache(self) -> Dict:
-        """Load cached minifigure data from disk."""
-        if self.minifig_cache_file.exists():
+        self.part_to_minifigs = self._load_part_index()
+
+        # Writes are batched: fetches mark the cache dirty and a flush
+        # happens at most every few seconds (plus once at exit), instead
+        # of rewriting the whole JSON file after every single fetch
+        self._minifig_dirty = False
+        self._price_dirty = False
+        self._last_flush = time.monotonic()
+        self._flush_interval = 5.0
+        # Guards the cache dicts and dirty flags when fetches run on a
+        # thread pool
+        self._cache_lock = threading.Lock()
+        atexit.register(self._flush_all)
+
+    @staticmethod
+    def _load_cache_file(path: Path) -> Dict:
+        """Load a JSON cache file (orjson when available)."""
+        if path.exists():
             try:
-                with open(self.minifig_cache_file, 'r') as f:
-                    return json.load(f)
+                data = path.read_bytes()
+                return orjson.loads(data) if orjson is not None else json.loads(data)
             except:
                 return {}
         return {}
-    
+
+    def _load_minifig_cache(self) -> Dict:
+        """Load cached minifigure data from disk."""
+        return self._load_cache_file(self.minifig_cache_file)
+
+    def _build_part_index(self) -> Dict[str, List[str]]:
+        """Build the reverse (part, color) -> minifig ids index."""
+        index: Dict[str, List[str]] = {}
+        for minifig_id, entry in self.minifig_cache.items():
+            for part in entry.get('parts', ()):
+                key = part['part_id'] + '\x00' + str(part['color_id'])
+                ids = index.get(key)
+                if ids is None:
+                    index[key] = [minifig_id]
+                else:
+                    ids.append(minifig_id)
+        return index
+
+    def _load_part_index(self) -> Dict[str, List[str]]:
+        """Load the reverse part index, rebuilding if the cache changed.
+
+        Keys pack part id and color id as 'part\\x00color' — the same
+        scheme the backend inventory index uses. The file stores the
+        minifig cache's mtime so a refreshed cache invalidates it.
+        """
+        mtime = (self.minifig_cache_file.stat().st_mtime
+                 if self.minifig_cache_file.exists() else 0)
+        stored = self._load_cache_file(self.part_index_file)
+        if stored.get('mtime') == mtime:
+            return stored.get('index', {})
+        index = self._build_part_index()
+        self._save_cache_file({'mtime': mtime, 'index': index}, self.part_index_file)
+        return index
+
     def _load_price_cache(self) -> Dict:
         """Load cached price data from disk."""
-        if self.price_cache_file.exists():
-            try:
-                with open(self.price_cache_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
-    
+        return self._load_cache_file(self.price_cache_file)
+
+    @staticmethod
+    def _save_cache_file(obj: Dict, path: Path):
+        """Serialize a cache (orjson when available) and replace atomically.
+
+        Compact output — these files are machine-consumed, and indenting
+        switches the stdlib encoder off its C fast path while doubling
+        the bytes written.
+        """
+        if orjson is not None:
+            data = orjson.dumps(obj)
+        else:
+            data = json.dumps(obj, separators=(',', ':')).encode('utf-8')
+        tmp = path.with_suffix('.tmp')
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
     def _save_minifig_cache(self):
-        """Save minifigure cache to disk."""
-        with open(self.minifig_cache_file, 'w') as f:
-            json.dump(self.minifig_cache, f, indent=2)
-    
+        """Save minifigure cache to disk (atomically, via temp file)."""
+        self._save_cache_file(self.minifig_cache, self.minifig_cache_file)
+        self._minifig_dirty = False
+
     def _save_price_cache(self):
-        """Save price cache to disk."""
-        with open(self.price_cache_file, 'w') as f:
-            json.dump(self.price_cache, f, indent=2)
-    
+        """Save price cache to disk (atomically, via temp file)."""
+        self._save_cache_file(self.price_cache, self.price_cache_file)
+        self._price_dirty = False
+
+    def _flush_if_due(self):
+        """Flush dirty caches when the batching interval has elapsed."""
+        now = time.monotonic()
+        if now - self._last_flush <= self._flush_interval:
+            return
+        self._flush_all()
+        self._last_flush = now
+
+    def _flush_all(self):
+        """Flush any dirty caches to disk."""
+        with self._cache_lock:
+            if self._minifig_dirty:
+                self._save_minifig_cache()
+            if self._price_dirty:
+                self._save_price_cache()
+
     def get_minifig_with_cache(self, minifig_id: str, use_cache_only: bool = False) -> Optional[Dict]:
         """Get minifigure data with caching."""
         # Check cache first
@@ -121,12 +257,14 @@ class CachedBrickLinkAPI(BrickLinkAPI):
             parts = self.get_minifigure_inventory(minifig_id)
             
             # Cache the result
-            self.minifig_cache[minifig_id] = {
-                'item_data': item_data,
-                'parts': [asdict(p) for p in parts]
-            }
-            self._save_minifig_cache()
-            
+            with self._cache_lock:
+                self.minifig_cache[minifig_id] = {
+                    'item_data': item_data,
+                    'parts': [asdict(p) for p in parts]
+                }
+                self._minifig_dirty = True
+            self._flush_if_due()
+
             return self.minifig_cache[minifig_id]
         except Exception as e:
             print(f"⚠️  Failed to fetch {minifig_id}: {e}")
@@ -141,18 +279,22 @@ class CachedBrickLinkAPI(BrickLinkAPI):
         if use_cache_only:
             return None
         
-        # Fetch from API
+        # Fetch from API; the price scrape doesn't go through the token
+        # bucket itself, so count it against the shared rate budget here
         try:
+            self._bucket.consume()
             price_data = self.get_price_guide('MINIFIG', minifig_id)
-            
+
             # Cache the result (store timestamp for reference)
             import datetime
-            self.price_cache[minifig_id] = {
-                'data': price_data,
-                'updated': datetime.datetime.now().isoformat()
-            }
-            self._save_price_cache()
-            
+            with self._cache_lock:
+                self.price_cache[minifig_id] = {
+                    'data': price_data,
+                    'updated': datetime.datetime.now().isoformat()
+                }
+                self._price_dirty = True
+            self._flush_if_due()
+
             return self.price_cache[minifig_id]
         except Exception as e:
             return None
@@ -163,35 +305,53 @@ class InventoryParser:
     
     def __init__(self, xml_path: Path):
         self.xml_path = xml_path
-        self.inventory: Dict[Tuple[str, int], InventoryPart] = {}
+        # Two-level part_id -> color_id -> part mapping; lookups hash a
+        # plain string and an int instead of allocating a (str, int)
+        # tuple at every call site
+        self.inventory: Dict[str, Dict[int, InventoryPart]] = {}
     
     def load(self) -> bool:
         """Load and parse XML inventory."""
         print(f"📂 Loading inventory: {self.xml_path.name}")
         
         try:
-            tree = ET.parse(self.xml_path)
-            root = tree.getroot()
-            
-            for item in root.findall('ITEM'):
-                item_id = item.find('ITEMID').text
-                item_type = item.find('ITEMTYPE').text
-                color = int(item.find('COLOR').text)
-                qty = int(item.find('QTY').text)
-                price_elem = item.find('PRICE')
-                price = float(price_elem.text) if price_elem is not None and price_elem.text else 0.0
-                remarks_elem = item.find('REMARKS')
-                remarks = remarks_elem.text if remarks_elem is not None and remarks_elem.text else ''
-                
-                if item_type in ['P', 'M']:
-                    key = (item_id, color)
-                    if key in self.inventory:
-                        self.inventory[key].quantity += qty
+            # Stream ITEM elements with iterparse instead of materializing
+            # the whole DOM; clearing each processed element keeps peak
+            # memory constant for 50k-part inventories. The root is
+            # captured from the first start event so processed items can
+            # be dropped from it too — otherwise they pile up as empty
+            # children and memory still grows with file size
+            root = None
+            inventory = self.inventory
+            inventory_get = inventory.get
+            for event, item in ET.iterparse(self.xml_path, events=('start', 'end')):
+                if root is None:
+                    root = item
+                if event != 'end' or item.tag != 'ITEM':
+                    continue
+                # One walk over the children instead of a linear find()
+                # per field (six scans per ITEM)
+                fields = {child.tag: child.text for child in item}
+                item_type = fields['ITEMTYPE']
+
+                if item_type in ('P', 'M'):
+                    item_id = fields['ITEMID']
+                    color = int(fields['COLOR'])
+                    qty = int(fields['QTY'])
+                    price = float(fields.get('PRICE') or 0.0)
+                    remarks = fields.get('REMARKS') or ''
+
+                    colors = inventory_get(item_id)
+                    if colors is None:
+                        colors = inventory[item_id] = {}
+                    existing = colors.get(color)
+                    if existing is not None:
+                        existing.quantity += qty
                         # Keep first remarks if multiple entries
-                        if not self.inventory[key].remarks and remarks:
-                            self.inventory[key].remarks = remarks
+                        if not existing.remarks and remarks:
+                            existing.remarks = remarks
                     else:
-                        self.inventory[key] = InventoryPart(
+                        colors[color] = InventoryPart(
                             part_id=item_id,
                             color_id=color,
                             quantity=qty,
@@ -199,9 +359,13 @@ class InventoryParser:
                             price=price,
                             remarks=remarks
                         )
-            
-            unique = len(self.inventory)
-            total = sum(p.quantity for p in self.inventory.values())
+                item.clear()
+                root.clear()
+
+            unique = sum(len(colors) for colors in self.inventory.values())
+            total = sum(p.quantity
+                        for colors in self.inventory.values()
+                        for p in colors.values())
             print(f"✅ Loaded: {unique:,} unique parts, {total:,} total pieces\n")
             return True
         except Exception as e:
@@ -210,9 +374,9 @@ class InventoryParser:
     
     def has_part(self, part_id: str, color_id: int, quantity: int = 1) -> Tuple[bool, int, str, float]:
         """Check if inventory has enough of a part. Returns (has_enough, available, remarks, price)."""
-        key = (part_id, color_id)
-        if key in self.inventory:
-            inv_part = self.inventory[key]
+        colors = self.inventory.get(part_id)
+        inv_part = colors.get(color_id) if colors else None
+        if inv_part is not None:
             return (inv_part.quantity >= quantity, inv_part.quantity, inv_part.remarks, inv_part.price)
         return (False, 0, '', 0.0)
 
@@ -236,7 +400,7 @@ class MinifigureFinder:
             return 0.0
         
         # Calculate total parts cost
-        parts_cost = sum(p['total_price'] for p in match.matched_details)
+        parts_cost = sum(p.total_price for p in match.matched_details)
         
         # Get market value from price data
         price_info = match.price_data.get('data', {})
@@ -262,7 +426,7 @@ class MinifigureFinder:
         if not match.matched_details:
             return 0.0
         
-        return sum(p['total_price'] for p in match.matched_details)
+        return sum(p.total_price for p in match.matched_details)
     
     def check_minifig(self, minifig_id: str, use_cache_only: bool = False) -> Optional[MinifigMatch]:
         """Check if a minifigure can be built from inventory."""
@@ -286,31 +450,37 @@ class MinifigureFinder:
         if not regular_parts:
             return None
         
-        # Check each part
-        matched = 0
-        missing = []
-        matched_parts = []
-        build_limits = []
-        
-        for part in regular_parts:
-            has_enough, available, remarks, price = self.inventory.has_part(
+        # Gather per-part inventory facts once into int32 arrays, run
+        # the integer matching math through the kernel, then build the
+        # result dicts from the mask
+        n = len(regular_parts)
+        needed = np.empty(n, dtype=np.int32)
+        avail_arr = np.empty(n, dtype=np.int32)
+        inv_facts = []
+        has_part = self.inventory.has_part
+        for i, part in enumerate(regular_parts):
+            _, available, remarks, price = has_part(
                 part.part_id, part.color_id, part.quantity
             )
-            if part.quantity > 0:
-                build_limits.append(available // part.quantity)
-            
-            if has_enough:
-                matched += 1
-                matched_parts.append({
-                    'part_id': part.part_id,
-                    'part_name': part.part_name,
-                    'color_id': part.color_id,
-                    'color_name': part.color_name,
-                    'quantity': part.quantity,
-                    'price': price,
-                    'total_price': price * part.quantity,
-                    'remarks': remarks
-                })
+            needed[i] = part.quantity
+            avail_arr[i] = available
+            inv_facts.append((remarks, price))
+
+        matched, buildable_count, has_mask = _match_kernel(needed, avail_arr)
+
+        missing = []
+        matched_parts = []
+
+        for i, part in enumerate(regular_parts):
+            remarks, price = inv_facts[i]
+            available = int(avail_arr[i])
+            if has_mask[i]:
+                matched_parts.append(MatchedPart(
+                    part.part_id, part.color_id, part.quantity,
+                    price, price * part.quantity,
+                    part.part_name, part.color_name, remarks,
+                    available
+                ))
             else:
                 missing.append({
                     'part_id': part.part_id,
@@ -326,8 +496,7 @@ class MinifigureFinder:
         
         total = len(regular_parts)
         match_pct = (matched / total * 100) if total > 0 else 0
-        buildable_count = min(build_limits) if build_limits else 0
-        
+
         return MinifigMatch(
             minifig_id=minifig_id,
             minifig_name=item_data.get('name', 'Unknown'),
@@ -351,115 +520,155 @@ class MinifigureFinder:
         Partial matches are allocated with remaining parts, sorted by match % and parts cost.
         Once a part is allocated, it's no longer available for other minifigures.
         """
+        # Prune minifigs that share zero parts with the inventory using
+        # the reverse part index — most of a large cache contributes
+        # nothing and never needs check_minifig at all. Ids missing from
+        # the cache are kept, since they may still be fetched live
+        index = self.api.part_to_minifigs
+        if index:
+            candidates: Set[str] = set()
+            for part_id, colors in self.inventory.inventory.items():
+                for color_id in colors:
+                    candidates.update(index.get(part_id + '\x00' + str(color_id), ()))
+            pruned = [mid for mid in minifig_ids
+                      if mid in candidates or mid not in self.api.minifig_cache]
+            if len(pruned) < len(minifig_ids):
+                print(f"🔎 Part index: {len(minifig_ids) - len(pruned)} minifigures share no parts with the inventory")
+            minifig_ids = pruned
+
         print(f"🔍 Checking {len(minifig_ids)} minifigures...")
         if use_cache_only:
             print("   (Using cached data only)")
-        
+
         # First pass: get all possible matches
         all_matches = []
-        
-        for i, minifig_id in enumerate(minifig_ids, 1):
-            if i % 10 == 0 or i == len(minifig_ids):
-                print(f"   Progress: {i}/{len(minifig_ids)}", end='\r')
-            
-            match = self.check_minifig(minifig_id, use_cache_only)
-            if match:
-                all_matches.append(match)
-            
-            # Rate limiting (only if not using cache)
-            if not use_cache_only:
-                time.sleep(0.15)
-        
+
+        if use_cache_only:
+            for i, minifig_id in enumerate(minifig_ids, 1):
+                if i % 10 == 0 or i == len(minifig_ids):
+                    print(f"   Progress: {i}/{len(minifig_ids)}", end='\r')
+
+                match = self.check_minifig(minifig_id, use_cache_only)
+                if match:
+                    all_matches.append(match)
+        else:
+            # Live checks are I/O-bound, so run them on a bounded pool;
+            # the API client's shared token bucket caps the global
+            # request rate (same budget the old 0.15s sleep enforced),
+            # while concurrent in-flight requests absorb latency
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                futures = [pool.submit(self.check_minifig, minifig_id, use_cache_only)
+                           for minifig_id in minifig_ids]
+                for i, future in enumerate(as_completed(futures), 1):
+                    if i % 10 == 0 or i == len(futures):
+                        print(f"   Progress: {i}/{len(futures)}", end='\r')
+                    match = future.result()
+                    if match:
+                        all_matches.append(match)
+
         print()  # New line
         
-        # Calculate metrics for all matches
+        # Calculate metrics for all matches once, up front — the sort
+        # key is evaluated per element, so summing parts cost inside it
+        # would redo the work for every match
         for match in all_matches:
             match.profit = self.calculate_profit(match) if match.can_build else 0.0
-        
+            match.parts_cost = self.calculate_parts_cost(match)
+            match.sort_year = match.year_released or 0
+
         # Separate complete and partial matches
         complete_matches = [m for m in all_matches if m.can_build]
         partial_matches = [m for m in all_matches if m.matched_parts > 0]
         
         # Sort complete matches: match %, profit, year
         complete_matches.sort(
-            key=lambda m: (m.match_percentage, m.profit, m.year_released or 0), 
+            key=lambda m: (m.match_percentage, m.profit, m.sort_year),
             reverse=True
         )
-        
+
         # Sort partial matches: match %, parts cost, year
         partial_matches.sort(
-            key=lambda m: (m.match_percentage, self.calculate_parts_cost(m), m.year_released or 0), 
+            key=lambda m: (m.match_percentage, m.parts_cost, m.sort_year),
             reverse=True
         )
         
         # Second pass: allocate parts and validate which can actually be built
         print("📦 Allocating parts to minifigures (complete first, then partial)...\n")
-        allocated_parts = defaultdict(int)  # (part_id, color_id) -> quantity allocated
-        
+
+        # Dense integer index over every (part_id, color_id) seen in the
+        # matches; allocation state lives in parallel int32 arrays, so
+        # the allocation loops do single array loads instead of hashing
+        # a (str, int) tuple per part
+        part_index: Dict[Tuple[str, int], int] = {}
+        available_list: List[int] = []
+        for match in all_matches:
+            for part_detail in match.matched_details or ():
+                key = (part_detail.part_id, part_detail.color_id)
+                if key not in part_index:
+                    part_index[key] = len(available_list)
+                    # check_minifig already looked this up; reuse it
+                    available_list.append(part_detail.available)
+        allocated = np.zeros(len(available_list), dtype=np.int32)
+        available_arr = np.array(available_list, dtype=np.int32)
+
         final_results = []
-        
+
         for match in complete_matches:
             # Check if this minifigure can be built with remaining parts
             can_still_build = True
             parts_to_allocate = []
             max_copies = None
-            
+
             for part_detail in match.matched_details:
-                part_id = part_detail['part_id']
-                color_id = part_detail['color_id']
-                quantity_needed = part_detail['quantity']
-                
-                # Get total available from inventory
-                has_enough, available, remarks, price = self.inventory.has_part(part_id, color_id, quantity_needed)
-                
+                quantity_needed = part_detail.quantity
+                idx = part_index[(part_detail.part_id, part_detail.color_id)]
+
                 # Check if enough remains after allocation to other minifigures
-                already_allocated = allocated_parts[(part_id, color_id)]
-                remaining_available = available - already_allocated
-                
+                remaining_available = int(available_arr[idx] - allocated[idx])
+
                 if remaining_available < quantity_needed:
                     can_still_build = False
                     break
-                
-                parts_to_allocate.append(((part_id, color_id), quantity_needed))
+
+                parts_to_allocate.append((idx, quantity_needed))
                 copies_for_part = remaining_available // quantity_needed
                 if max_copies is None:
                     max_copies = copies_for_part
                 else:
                     max_copies = min(max_copies, copies_for_part)
-            
+
             if can_still_build:
                 copies_to_allocate = max_copies if max_copies is not None else 1
-                for (part_id, color_id), qty in parts_to_allocate:
-                    allocated_parts[(part_id, color_id)] += qty * copies_to_allocate
+                for idx, qty in parts_to_allocate:
+                    allocated[idx] += qty * copies_to_allocate
                 match.buildable_count = copies_to_allocate
                 final_results.append(match)
 
         for match in partial_matches:
             available_parts = []
             unavailable_parts = []
-            
+
             for part_detail in match.matched_details:
-                part_id = part_detail['part_id']
-                color_id = part_detail['color_id']
-                quantity_needed = part_detail['quantity']
-                
+                part_id = part_detail.part_id
+                color_id = part_detail.color_id
+                quantity_needed = part_detail.quantity
+
                 # Check if enough remains after allocation to complete minifigures
-                has_enough, available, remarks, price = self.inventory.has_part(part_id, color_id, quantity_needed)
-                already_allocated = allocated_parts[(part_id, color_id)]
-                remaining_available = available - already_allocated
+                idx = part_index[(part_id, color_id)]
+                remaining_available = int(available_arr[idx] - allocated[idx])
                 
                 if remaining_available >= quantity_needed:
                     available_parts.append(part_detail)
                 else:
                     unavailable_parts.append({
                         'part_id': part_id,
-                        'part_name': part_detail['part_name'],
+                        'part_name': part_detail.part_name,
                         'color_id': color_id,
-                        'color_name': part_detail['color_name'],
+                        'color_name': part_detail.color_name,
                         'needed': quantity_needed,
                         'available': max(0, remaining_available),
                         'short_by': quantity_needed - max(0, remaining_available),
-                        'price': part_detail['price'],
+                        'price': part_detail.price,
                         'remarks': f"Parts reserved for higher-priority minifigures"
                     })
             
@@ -509,14 +718,14 @@ def save_results_json(matches: List[MinifigMatch], output_file: Path):
     complete = [m for m in matches if m.can_build]
     incomplete = [m for m in matches if not m.can_build]
     
-    # Convert to dictionaries with only necessary data
+    # Convert to dictionaries with only necessary data; matched parts
+    # stay as MatchedPart objects until this point and are serialized
+    # here via to_dict
     def match_to_dict(match: MinifigMatch) -> Dict:
-        d = asdict(match)
-        
         # Extract 6-month average prices
         price_summary = None
-        if d['price_data']:
-            price_info = d['price_data'].get('data', {})
+        if match.price_data:
+            price_info = match.price_data.get('data', {})
             if price_info:
                 ordered_new = price_info.get('ordered_new', {})
                 ordered_used = price_info.get('ordered_used', {})
@@ -531,20 +740,20 @@ def save_results_json(matches: List[MinifigMatch], output_file: Path):
                         price_summary['used_condition'] = avg_used
         
         return {
-            'minifig_id': d['minifig_id'],
-            'minifig_name': d['minifig_name'],
-            'year_released': d['year_released'],
-            'category_name': d['category_name'],
-            'total_parts': d['total_parts'],
-            'buildable_count': d.get('buildable_count', 0),
-            'matched_parts': d['matched_parts'],
-            'missing_parts': d['missing_parts'],
-            'match_percentage': d['match_percentage'],
-            'can_build': d['can_build'],
-            'profit': round(d['profit'], 2),
+            'minifig_id': match.minifig_id,
+            'minifig_name': match.minifig_name,
+            'year_released': match.year_released,
+            'category_name': match.category_name,
+            'total_parts': match.total_parts,
+            'buildable_count': match.buildable_count,
+            'matched_parts': match.matched_parts,
+            'missing_parts': match.missing_parts,
+            'match_percentage': match.match_percentage,
+            'can_build': match.can_build,
+            'profit': round(match.profit, 2),
             'prices_6month_average': price_summary,
-            'all_parts': d['matched_details'] if d['matched_details'] else [],
-            'missing_details': d['missing_details']
+            'all_parts': [p.to_dict() for p in match.matched_details] if match.matched_details else [],
+            'missing_details': match.missing_details
         }
     
     output_data = {
@@ -593,7 +802,7 @@ def print_results(matches: List[MinifigMatch], complete_only: bool = False):
             
             # Calculate total parts value
             if match.matched_details:
-                parts_total = sum(p['total_price'] for p in match.matched_details)
+                parts_total = sum(p.total_price for p in match.matched_details)
                 print(f"   💵 Parts Total Value: ${parts_total:.2f}")
             
             # Show price if available
@@ -626,12 +835,12 @@ def print_results(matches: List[MinifigMatch], complete_only: bool = False):
             if match.matched_details:
                 print(f"\n   📦 Parts from your inventory:")
                 for i, part_detail in enumerate(match.matched_details, 1):
-                    qty_str = f"{part_detail['quantity']}x" if part_detail['quantity'] > 1 else "1x"
-                    price_str = f"${part_detail['price']:.2f}" if part_detail['price'] > 0 else "$0.00"
-                    total_str = f"${part_detail['total_price']:.2f}" if part_detail['total_price'] > 0 else "$0.00"
-                    remarks_str = f" [{part_detail['remarks']}]" if part_detail['remarks'] else ""
-                    print(f"      {i}. {qty_str} {part_detail['part_id']} - {part_detail['part_name']}")
-                    print(f"         Color: {part_detail['color_name']} | Price: {price_str} ea. | Total: {total_str}{remarks_str}")
+                    qty_str = f"{part_detail.quantity}x" if part_detail.quantity > 1 else "1x"
+                    price_str = f"${part_detail.price:.2f}" if part_detail.price > 0 else "$0.00"
+                    total_str = f"${part_detail.total_price:.2f}" if part_detail.total_price > 0 else "$0.00"
+                    remarks_str = f" [{part_detail.remarks}]" if part_detail.remarks else ""
+                    print(f"      {i}. {qty_str} {part_detail.part_id} - {part_detail.part_name}")
+                    print(f"         Color: {part_detail.color_name} | Price: {price_str} ea. | Total: {total_str}{remarks_str}")
         
         if len(complete) > 20:
             print(f"\n   ... and {len(complete) - 20} more complete matches")
@@ -650,7 +859,7 @@ def print_results(matches: List[MinifigMatch], complete_only: bool = False):
             
             # Calculate total parts value for what we have
             if match.matched_details:
-                parts_total = sum(p['total_price'] for p in match.matched_details)
+                parts_total = sum(p.total_price for p in match.matched_details)
                 print(f"   💵 Available Parts Value: ${parts_total:.2f}")
 
             # Show price if available
@@ -672,10 +881,10 @@ def print_results(matches: List[MinifigMatch], complete_only: bool = False):
             if match.matched_details:
                 print(f"\n   ✓ Parts from your inventory ({len(match.matched_details)} available):")
                 for i, part_detail in enumerate(match.matched_details, 1):
-                    qty_str = f"{part_detail['quantity']}x" if part_detail['quantity'] > 1 else "1x"
-                    price_str = f"${part_detail['price']:.2f}" if part_detail['price'] > 0 else "$0.00"
-                    print(f"      {i}. {qty_str} {part_detail['part_id']} - {part_detail['part_name']}")
-                    print(f"         Color: {part_detail['color_name']} | Price: {price_str} ea.")
+                    qty_str = f"{part_detail.quantity}x" if part_detail.quantity > 1 else "1x"
+                    price_str = f"${part_detail.price:.2f}" if part_detail.price > 0 else "$0.00"
+                    print(f"      {i}. {qty_str} {part_detail.part_id} - {part_detail.part_name}")
+                    print(f"         Color: {part_detail.color_name} | Price: {price_str} ea.")
             
             if match.missing_details:
                 print(f"\n   ✗ Missing parts ({len(match.missing_details)} needed):")